@@ -1,71 +1,367 @@
 from __future__ import annotations
-import argparse, io, re, time
-from dataclasses import dataclass, asdict
-from typing import List, Optional, Tuple, Dict
+import argparse, concurrent.futures, contextlib, csv, hashlib, io, itertools, json, multiprocessing, os, pathlib, re, threading, time
+from collections import defaultdict
+from html.parser import HTMLParser
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Dict
+from urllib.parse import urljoin, urlparse
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
-from pdfminer.high_level import extract_text as pdf_extract_text
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.html
+from lxml import etree
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer
+try:
+    import re2 as _re  # linear-time RE2 engine for the big per-document scan
+except ImportError:
+    _re = re
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pdfminer alone still works, just slower
+    pdfium = None
 
 UA = "emily-research-screen/1.0 (mailto:xmeng05@uw.edu)"
 AGE_MIN = 2
 AGE_MAX = 17
-
-def polite_get(url: str, timeout=25) -> Optional[requests.Response]:
+HOST_DELAY = 0.3  # seconds between requests to the same host
+MAX_PDF_BYTES = 5 * 1024 * 1024  # cap on any downloaded body; past this we only keep the head
+PDF_MAX_PAGES = 8  # age statements live in the abstract/methods; don't parse whole PDFs
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})  # worth asking again later
+OUT_FIELDS = ["Covidence #", "decision", "reasons", "source_url", "evidence"]
+CACHE_DIR = pathlib.Path(os.environ.get("GRAND_CACHE", "~/.cache/grand-age")).expanduser()
+CACHE_TTL = 30 * 86400  # seconds; re-fetch a URL's full text after this
+# bump when text extraction changes (incl. the page early-exit, which follows the age patterns)
+CACHE_VERSION = 2
+
+# per-host politeness: one lock + last-request timestamp per netloc
+_HOST_LOCKS: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_HOST_LAST: Dict[str, float] = defaultdict(float)
+
+# PDFium is not thread-safe: every call into it, close() included, holds this
+_PDFIUM_LOCK = threading.Lock()
+
+# age-evidence phrasings compiled once at import; the outer named group tells us
+# which kind matched (m.lastgroup). Case-folding is inline (?i) because
+# google-re2's compile() takes no re-style flags.
+# mean/median/aged/grade hits can never overlap one another, so they share one
+# alternation. A range or single age can overlap them (and each other: "6-18
+# years old" is both), so those two keep their own scans.
+_AGE_RE = _re.compile(
+    r"(?i)"
+    # mean / average age (allow "of"/"was", "=", ":", and optional "years")
+    r"(?P<mean>(?:mean|average)\s+age(?:\s+at\s+baseline)?\s*(?:of|was|=|:)?\s*(?P<mean_v>\d{1,2}(?:\.\d+)?)\s*(?:years?|y\.o\.)?)"
+    # median age (same flexibility)
+    r"|(?P<median>median\s+age(?:\s+at\s+baseline)?\s*(?:of|was|=|:)?\s*(?P<median_v>\d{1,2}(?:\.\d+)?)\s*(?:years?|y\.o\.)?)"
+    # ranges: "aged 12-16"
+    r"|(?P<aged>aged\s+(?P<aged_lo>\d{1,2})\s*-\s*(?P<aged_hi>\d{1,2}))"
+    # school grade: "grade 5" / "grade 5-7"
+    r"|(?P<grade>grade\s+(?P<grade_lo>\d{1,2})(?:\s*-\s*(?P<grade_hi>\d{1,2}))?)")
+# other range phrasing: "between 3 and 10 years", "3 to 10 years"
+_BETWEEN_RE = _re.compile(
+    r"(?i)(?P<between>(?:between\s+)?(?P<between_lo>\d{1,2})\s*(?:to|and|-)\s*(?P<between_hi>\d{1,2})\s*(?:years|y\.o\.))")
+# single age: "15 years old" / "15 y.o."
+_SINGLE_RE = _re.compile(r"(?i)(?P<single>(?P<single_v>\d{1,2})\s*(?:years?\s*old|y\.o\.))")
+_WS_RE = re.compile(r"\s+")
+# RE2's \s is ASCII-only ([\t\n\f\r ]), so every other whitespace char (NBSP,
+# thin space, ...) is mapped to " " one-for-one before a scan; offsets don't move
+_UNICODE_WS_RE = re.compile(r"[^\S\t\n\f\r ]")
+
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": UA, "Accept-Encoding": "gzip"})
+_ADAPTER = HTTPAdapter(
+    pool_connections=32, pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=sorted(RETRY_STATUS)),
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+def _wait_for_host(host: str, gap: float = HOST_DELAY) -> None:
+    with _HOST_LOCKS[host]:
+        dt = time.monotonic() - _HOST_LAST[host]
+        if dt < gap:
+            time.sleep(gap - dt)
+        _HOST_LAST[host] = time.monotonic()
+
+# errors that say nothing about the URL itself, only about this attempt
+_TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout,
+                     requests.exceptions.ChunkedEncodingError, requests.exceptions.RetryError)
+
+def _polite_fetch(url: str, timeout=25, max_bytes: int = MAX_PDF_BYTES
+                  ) -> Tuple[Optional[Tuple[requests.Response, bytes]], bool]:
+    """polite_get's result, plus whether a None is transient (network error, 429/5xx) rather than final."""
     try:
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=timeout)
-        if r.status_code == 200:
-            return r
+        _wait_for_host(urlparse(url).netloc)
+        with _SESSION.get(url, stream=True, timeout=timeout) as r:
+            if r.status_code != 200:
+                return None, r.status_code in RETRY_STATUS
+            if int(r.headers.get("Content-Length") or 0) > max_bytes:
+                return None, False
+            buf = io.BytesIO()
+            for chunk in r.iter_content(65536):
+                buf.write(chunk)
+                if buf.tell() > max_bytes:
+                    break
+            return (r, buf.getvalue()), False
+    except _TRANSIENT_ERRORS:
+        return None, True
     except Exception:
-        return None
-    return None
+        return None, False
+
+def polite_get(url: str, timeout=25, max_bytes: int = MAX_PDF_BYTES) -> Optional[Tuple[requests.Response, bytes]]:
+    """GET url, streaming at most max_bytes of body; None on error, non-200 or an oversized Content-Length."""
+    return _polite_fetch(url, timeout, max_bytes)[0]
 
 def looks_like_pdf_url(url: str) -> bool:
     u = (url or "").lower()
     return u.endswith(".pdf") or "pdf" in u.split("?")[0].split("#")[0]
 
-def fetch_fulltext_from_url(url: str) -> Tuple[str, str]:
+def _pdfium_pages(data: bytes, max_pages: int) -> Iterator[str]:
+    pdf = pdfium.PdfDocument(data)
+    try:
+        for i in range(min(len(pdf), max_pages)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+def _pdfminer_pages(data: bytes, max_pages: int) -> Iterator[str]:
+    laparams = LAParams(detect_vertical=False, all_texts=False)
+    for page_layout in extract_pages(io.BytesIO(data), laparams=laparams, maxpages=max_pages):
+        yield "".join(el.get_text() for el in page_layout if isinstance(el, LTTextContainer))
+
+def _read_until_evidence(pages: Iterable[str]) -> str:
+    read = []
+    for page in pages:
+        read.append(page)
+        if _has_age_match(_scan_text(page)):
+            break
+    return "\n".join(read)
+
+def _scan_text(t: str) -> str:
+    t = t.replace("–", "-").replace("—", "-")
+    return _UNICODE_WS_RE.sub(" ", t) if _re is not re else t
+
+def _has_age_match(t: str) -> bool:
+    return any(rx.search(t) for rx in (_AGE_RE, _BETWEEN_RE, _SINGLE_RE))
+
+def pdf_extract_text(data: bytes, max_pages: int = PDF_MAX_PAGES) -> str:
+    """Text of the first pages of a PDF, stopping after the first page with age evidence."""
+    if pdfium is not None:
+        try:
+            # closing() runs the generator's page/document cleanup before the lock is released
+            with _PDFIUM_LOCK, contextlib.closing(_pdfium_pages(data, max_pages)) as pages:
+                return _read_until_evidence(pages)
+        except Exception:
+            pass  # e.g. a PDF PDFium rejects; let pdfminer have a go
+    return _read_until_evidence(_pdfminer_pages(data, max_pages))
+
+def _cache_path(url: str) -> pathlib.Path:
+    # settings that shape the stored text are part of the key, so entries made under
+    # other settings are never served
+    key = f"{CACHE_VERSION}|{pdfium is not None}|{PDF_MAX_PAGES}|{MAX_PDF_BYTES}|{url}"
+    h = hashlib.sha1(key.encode()).hexdigest()
+    return CACHE_DIR / h[:2] / (h + ".json")
+
+def _cache_load(url: str) -> Optional[Tuple[str, str]]:
+    p = _cache_path(url)
+    try:
+        if time.time() - p.stat().st_mtime > CACHE_TTL:
+            return None
+        d = json.loads(p.read_text(encoding="utf-8"))
+        return d["text"], d["source_url"]
+    except Exception:  # missing, unreadable or corrupt
+        return None
+
+def _cache_store(url: str, text: str, src: str) -> None:
+    p = _cache_path(url)
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # unique tmp name so concurrent workers never share one; replace() is atomic
+        tmp = p.with_name(f"{p.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"source_url": src, "text": text}), encoding="utf-8")
+        tmp.replace(p)
+    except OSError:
+        pass
+
+class _EnoughLinks(Exception):
+    pass
+
+class _PdfLinkSniffer(HTMLParser):
+    """Collects hrefs of <a> tags whose href or link text mentions "pdf"; stops after max_links."""
+
+    def __init__(self, max_links: int = 10):
+        super().__init__()
+        self.max_links = max_links
+        self.links: List[str] = []
+        self._href: Optional[str] = None  # open anchor whose label we still need to check
+        self._label: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        self._finish_anchor()
+        href = dict(attrs).get("href")
+        if href is None:
+            return
+        if "pdf" in href.lower():
+            self._add(href)
+        else:
+            self._href, self._label = href, []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._label.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._finish_anchor()
+
+    def _finish_anchor(self):
+        href, self._href = self._href, None
+        if href is not None and "pdf" in "".join(self._label).lower():
+            self._add(href)
+
+    def _add(self, href: str):
+        self.links.append(href)
+        if len(self.links) >= self.max_links:
+            raise _EnoughLinks
+
+def _sniff_pdf_links(html: str, max_links: int = 10, chunk: int = 65536) -> List[str]:
+    sniffer = _PdfLinkSniffer(max_links)
+    try:
+        for i in range(0, len(html), chunk):
+            sniffer.feed(html[i:i + chunk])
+        sniffer.close()
+        sniffer._finish_anchor()  # an <a> left open at EOF
+    except _EnoughLinks:
+        pass
+    return sniffer.links
+
+def _html_charset(r: requests.Response) -> str:
+    # only a declared charset is trusted; requests' ISO-8859-1 default for text/* isn't
+    ct = (r.headers.get("Content-Type") or "").lower()
+    return r.encoding if "charset" in ct and r.encoding else "utf-8"
+
+def _decode_html(body: bytes, charset: str) -> str:
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+def _parse_html(body: bytes, charset: str):
+    # bytes in, with the same charset as _decode_html; left to itself lxml falls back to Latin-1
+    try:
+        parser = lxml.html.HTMLParser(encoding=charset)
+    except LookupError:
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+    return lxml.html.fromstring(body, parser=parser)
+
+_SKIP_TAGS = frozenset({"script", "style", "noscript", "head"})
+
+def _visible_text(doc) -> str:
+    """One walk over the DOM, writing text/tails outside skipped subtrees into one buffer."""
+    buf = io.StringIO()
+    skip = 0  # depth inside a skipped subtree
+    # comment/pi events are needed for their tails, which are ordinary page text
+    for event, el in etree.iterwalk(doc, events=("start", "end", "comment", "pi")):
+        if event == "start":
+            if skip or el.tag in _SKIP_TAGS:
+                skip += 1
+            elif el.text:
+                buf.write(el.text)
+                buf.write("\n")
+            continue
+        if event == "end" and skip:
+            skip -= 1
+        if not skip and el.tail and el is not doc:
+            buf.write(el.tail)
+            buf.write("\n")
+    return buf.getvalue()
+
+@dataclass(slots=True, frozen=True)
+class FetchedDoc:
+    """What a fetch thread hands to the process pool; the bodies are parsed there."""
+    url: str
+    text: Optional[str] = None  # cache hit: already extracted, nothing to parse
+    source_url: str = ""
+    pdf: Optional[bytes] = None  # the URL's own PDF, or the landing page's first PDF link
+    pdf_url: str = ""
+    html: Optional[bytes] = None  # landing page, for the visible-text fallback
+    charset: str = "utf-8"
+    pdf_failed: bool = False  # a PDF link failed transiently before one was picked; result may be degraded
+
+def fetch_document(url: str, use_cache: bool = True) -> FetchedDoc:
+    """Network half of the full-text lookup: cache, landing page, PDF link. No parsing."""
     if not url or not url.lower().startswith("http"):
-        return "", ""
-    r = polite_get(url)
-    if not r:
-        return "", ""
+        return FetchedDoc(url)
+    if use_cache:
+        hit = _cache_load(url)
+        if hit:
+            return FetchedDoc(url, text=hit[0], source_url=hit[1])
+    got = polite_get(url)
+    if not got:
+        return FetchedDoc(url)
+    r, body = got
     ct = (r.headers.get("Content-Type") or "").lower()
     if "pdf" in ct or looks_like_pdf_url(url):
+        return FetchedDoc(url, pdf=body, pdf_url=url)
+    charset = _html_charset(r)
+    try:
+        cand = _sniff_pdf_links(_decode_html(body, charset))
+        pdf_urls = [urljoin(url, h) for h in cand]  # raises on e.g. "http://[broken/x.pdf"
+    except Exception:
+        return FetchedDoc(url)
+    failed = False
+    for pu in pdf_urls[:3]:
+        got, transient = _polite_fetch(pu)
+        failed = failed or transient  # a 404 or oversize PDF is final; the fallback can be cached
+        # nothing is parsed here, so skip bodies that aren't PDFs at all (e.g. a
+        # paywall page behind a .pdf link) rather than finding out in the pool
+        if got and ("pdf" in (got[0].headers.get("Content-Type", "").lower()) or looks_like_pdf_url(pu)) \
+                and b"%PDF-" in got[1][:1024]:
+            return FetchedDoc(url, pdf=got[1], pdf_url=pu, html=body, charset=charset, pdf_failed=failed)
+    return FetchedDoc(url, html=body, charset=charset, pdf_failed=failed)
+
+def extract_fulltext(doc: FetchedDoc) -> Tuple[str, str]:
+    """CPU half: (text, source_url) from a FetchedDoc's bodies."""
+    if doc.text is not None:
+        return doc.text, doc.source_url
+    if doc.pdf is not None:
         try:
-            text = pdf_extract_text(io.BytesIO(r.content))
-            return (text or "", url)
+            text = pdf_extract_text(doc.pdf)
         except Exception:
-            return "", ""
+            text = None
+        if doc.html is None:  # the URL itself was the PDF
+            return ("", "") if text is None else (text, doc.url)
+        if text:
+            return text, doc.pdf_url
+    if doc.html is None:
+        return "", ""
     try:
-        html = r.text
-        soup = BeautifulSoup(html, "lxml")
-        cand = []
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            label = (a.get_text() or "").lower()
-            if "pdf" in href.lower() or "pdf" in label:
-                cand.append(href)
-        from urllib.parse import urljoin
-        pdf_urls = [urljoin(url, h) for h in cand]
-        for pu in pdf_urls[:3]:
-            pr = polite_get(pu)
-            if pr and ("pdf" in (pr.headers.get("Content-Type", "").lower()) or looks_like_pdf_url(pu)):
-                try:
-                    text = pdf_extract_text(io.BytesIO(pr.content))
-                    if text:
-                        return text, pu
-                except Exception:
-                    continue
-        for tag in soup(["script", "style", "noscript"]):
-            tag.extract()
-        text = soup.get_text(separator="\n")
-        return text, url
+        # no usable PDF link: only now pay for a full DOM parse
+        return _visible_text(_parse_html(doc.html, doc.charset)), doc.url
     except Exception:
         return "", ""
 
-@dataclass
+def _extract_and_cache(doc: FetchedDoc, use_cache: bool) -> Tuple[str, str]:
+    text, src = extract_fulltext(doc)
+    # a PDF link that was only down for now mustn't pin its fallback in the cache
+    if use_cache and doc.text is None and text and not doc.pdf_failed:
+        _cache_store(doc.url, text, src)
+    return text, src
+
+def fetch_fulltext_from_url(url: str, use_cache: bool = True) -> Tuple[str, str]:
+    return _extract_and_cache(fetch_document(url, use_cache), use_cache)
+
+@dataclass(slots=True, frozen=True)
 class AgeEvidence:
     kind: str
     value: Optional[float]
@@ -73,8 +369,12 @@ class AgeEvidence:
     high: Optional[float]
     context: str
 
+def _evidence_dict(e: AgeEvidence) -> Dict:
+    # flat scalars only, so skip dataclasses.asdict's recursive deepcopy
+    return {"kind": e.kind, "value": e.value, "low": e.low, "high": e.high, "context": e.context}
+
 def _clean(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip()
+    return _WS_RE.sub(" ", s).strip()
 
 def grade_to_age_bounds(g: int) -> Tuple[int, int]:
     low = 6 + (g - 1)
@@ -84,7 +384,7 @@ def grade_to_age_bounds(g: int) -> Tuple[int, int]:
 def extract_age_evidence(text: str) -> List[AgeEvidence]:
     if not text:
         return []
-    t = text.replace("–", "-").replace("—", "-")
+    t = _scan_text(text)
 
     def ctx(i0: int, i1: int) -> str:
         lo = max(0, i0 - 80)
@@ -94,70 +394,36 @@ def extract_age_evidence(text: str) -> List[AgeEvidence]:
     evid: List[AgeEvidence] = []
     seen = set()  # dedupe by (kind, value, low, high, short_ctx)
 
-    # mean / average age (allow "of"/"was", "=", ":", and optional "years")
-    for m in re.finditer(
-        r"(?:mean|average)\s+age(?:\s+at\s+baseline)?\s*(?:of|was|=|:)?\s*(\d{1,2}(?:\.\d+)?)\s*(?:years?|y\.o\.)?",
-        t, flags=re.I):
+    fused: Dict[str, list] = defaultdict(list)
+    for m in _AGE_RE.finditer(t):
+        fused[m.lastgroup].append(m)
+
+    # same kind order as one scan per phrasing, so the first hit of a key wins as before
+    for m in itertools.chain(fused["mean"], fused["median"], fused["aged"],
+                             _BETWEEN_RE.finditer(t), _SINGLE_RE.finditer(t), fused["grade"]):
+        kind = m.lastgroup
+        if kind in ("mean", "median", "single"):
+            kind, value, lo, hi = kind, float(m.group(kind + "_v")), None, None
+        elif kind in ("aged", "between"):
+            lo, hi = float(m.group(kind + "_lo")), float(m.group(kind + "_hi"))
+            kind, value = "range", None
+        else:  # grade
+            g1 = int(m.group("grade_lo"))
+            g2 = int(m.group("grade_hi")) if m.group("grade_hi") else g1
+            lo1, hi1 = grade_to_age_bounds(g1)
+            lo2, hi2 = grade_to_age_bounds(g2)
+            value, lo, hi = None, float(min(lo1, lo2)), float(max(hi1, hi2))
         c = ctx(*m.span())
-        key = ("mean", float(m.group(1)), None, None, c[:120])
+        key = (kind, value, lo, hi, c[:120])
         if key not in seen:
             seen.add(key)
-            evid.append(AgeEvidence("mean", float(m.group(1)), None, None, c))
-
-    # median age (same flexibility)
-    for m in re.finditer(
-        r"median\s+age(?:\s+at\s+baseline)?\s*(?:of|was|=|:)?\s*(\d{1,2}(?:\.\d+)?)\s*(?:years?|y\.o\.)?",
-        t, flags=re.I):
-        c = ctx(*m.span())
-        key = ("median", float(m.group(1)), None, None, c[:120])
-        if key not in seen:
-            seen.add(key)
-            evid.append(AgeEvidence("median", float(m.group(1)), None, None, c))
-
-    # ranges: "aged 12-16"
-    for m in re.finditer(r"aged\s+(\d{1,2})\s*-\s*(\d{1,2})", t, flags=re.I):
-        lo, hi = int(m.group(1)), int(m.group(2))
-        c = ctx(*m.span())
-        key = ("range", None, float(lo), float(hi), c[:120])
-        if key not in seen:
-            seen.add(key)
-            evid.append(AgeEvidence("range", None, float(lo), float(hi), c))
-
-    # other range phrasing: "between 3 and 10 years", "3 to 10 years"
-    for m in re.finditer(r"(?:between\s+)?(\d{1,2})\s*(?:to|and|-)\s*(\d{1,2})\s*(?:years|y\.o\.)", t, flags=re.I):
-        lo, hi = int(m.group(1)), int(m.group(2))
-        c = ctx(*m.span())
-        key = ("range", None, float(lo), float(hi), c[:120])
-        if key not in seen:
-            seen.add(key)
-            evid.append(AgeEvidence("range", None, float(lo), float(hi), c))
-
-    # single age: "15 years old" / "15 y.o."
-    for m in re.finditer(r"(\d{1,2})\s*(?:years?\s*old|y\.o\.)", t, flags=re.I):
-        val = float(m.group(1))
-        c = ctx(*m.span())
-        key = ("single", val, None, None, c[:120])
-        if key not in seen:
-            seen.add(key)
-            evid.append(AgeEvidence("single", val, None, None, c))
-
-    for m in re.finditer(r"grade\s+(\d{1,2})(?:\s*-\s*(\d{1,2}))?", t, flags=re.I):
-        g1 = int(m.group(1))
-        g2 = int(m.group(2)) if m.group(2) else g1
-        lo1, hi1 = grade_to_age_bounds(g1)
-        lo2, hi2 = grade_to_age_bounds(g2)
-        lo = min(lo1, lo2); hi = max(hi1, hi2)
-        c = ctx(*m.span())
-        key = ("grade", None, float(lo), float(hi), c[:120])
-        if key not in seen:
-            seen.add(key)
-            evid.append(AgeEvidence("grade", None, float(lo), float(hi), c))
+            evid.append(AgeEvidence(kind, value, lo, hi, c))
 
     #months 
     # 115 month / 12 
     return evid
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgeDecision:
     covidence_num: str
     decision: str           # "Yes" | "No" | "Maybe" | "UnknownAge"
@@ -205,7 +471,7 @@ def decide_age(evid: List[AgeEvidence], covidence_num: str, source_url: str) ->
         return AgeDecision(
             covidence_num, "Maybe",
             ["Age described at baseline only; no in-range mean reported."],
-            [asdict(e) for e in evid], source_url
+            [_evidence_dict(e) for e in evid], source_url
         )
 
     # rule 2: hard Yes only when mean age is in-range (2–17)
@@ -215,12 +481,12 @@ def decide_age(evid: List[AgeEvidence], covidence_num: str, source_url: str) ->
             return AgeDecision(
                 covidence_num, "Maybe",
                 ["In-range mean detected, but mixed cohorts also out-of-range."],
-                [asdict(e) for e in evid], source_url
+                [_evidence_dict(e) for e in evid], source_url
             )
         return AgeDecision(
             covidence_num, "Yes",
             ["In-range mean age detected (2–17)."],
-            [asdict(e) for e in evid], source_url
+            [_evidence_dict(e) for e in evid], source_url
         )
 
     # rule 3: no mean; but other signals in range → Maybe
@@ -228,7 +494,7 @@ def decide_age(evid: List[AgeEvidence], covidence_num: str, source_url: str) ->
         return AgeDecision(
             covidence_num, "Maybe",
             ["Age appears in range, but no mean reported."],
-            [asdict(e) for e in evid], source_url
+            [_evidence_dict(e) for e in evid], source_url
         )
 
     # rule 4: everything we saw is outside → No
@@ -236,72 +502,133 @@ def decide_age(evid: List[AgeEvidence], covidence_num: str, source_url: str) ->
         return AgeDecision(
             covidence_num, "No",
             ["All detected age evidence outside 2–17 (<2 or ≥18)."],
-            [asdict(e) for e in evid], source_url
+            [_evidence_dict(e) for e in evid], source_url
         )
 
     # fallback
     return AgeDecision(
         covidence_num, "UnknownAge", 
         ["Age not determinable; consider checking supplements."],
-        [asdict(e) for e in evid], source_url
+        [_evidence_dict(e) for e in evid], source_url
     )
 
+def _interleave_by_host(jobs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    # round-robin across hosts so workers don't all queue on one publisher's lock
+    buckets: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    for cov_num, url in jobs:
+        buckets[urlparse(url).netloc].append((cov_num, url))
+    out = []
+    queues = list(buckets.values())
+    while queues:
+        for q in queues:
+            out.append(q.pop(0))
+        queues = [q for q in queues if q]
+    return out
+
+def _process_doc(job: Tuple[str, FetchedDoc, bool]) -> Dict:
+    # runs in a Pool worker: PDF/HTML parsing, extraction and the decision all
+    # happen here; patterns are compiled at import, so children have them too
+    cov_num, doc, use_cache = job
+    text, src = _extract_and_cache(doc, use_cache)
+    evid = extract_age_evidence(text) if text else []
+    dec = decide_age(evid, cov_num, src)
+    return {
+        "Covidence #": dec.covidence_num,
+        "decision": dec.decision,
+        "reasons": "; ".join(dec.reasons),
+        "source_url": dec.source_url,
+        "evidence": json.dumps(dec.evidence, ensure_ascii=False),
+    }
 
 def main():
     ap = argparse.ArgumentParser(description="Screen mean/age ranges from URL full text against 2–17 window.")
     ap.add_argument("csv_path", help="CSV from find_links.py (must have 'Covidence #' and a URL column)")
     ap.add_argument("--url-col", default="found_url", help="Column containing the URL (default: found_url)")
     ap.add_argument("--n", type=int, default=10, help="Max rows to process")
+    ap.add_argument("--workers", type=int, default=16, help="Concurrent URL fetches (default: 16)")
+    ap.add_argument("--procs", type=int, default=os.cpu_count(), help="Processes for evidence extraction (default: CPU count)")
     ap.add_argument("--out", default=None, help="Optional output CSV for decisions")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and don't write the full-text cache ($GRAND_CACHE)")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.csv_path)
+    # header only, to resolve column names before the real (narrow) read
+    columns = list(pd.read_csv(args.csv_path, nrows=0).columns)
     # case-insensitive mapping
-    colmap = {c.lower().strip(): c for c in df.columns}
+    colmap = {c.lower().strip(): c for c in columns}
     url_col_real = colmap.get(args.url_col.lower())
     if not url_col_real:
-        raise ValueError(f"URL column '{args.url_col}' not found. Available: {list(df.columns)}")
+        raise ValueError(f"URL column '{args.url_col}' not found. Available: {columns}")
     cov_col_real = colmap.get("covidence #")
     if not cov_col_real:
         raise ValueError("Input must include a 'Covidence #' column (e.g., '#293').")
 
-    rows = []
-    processed = 0
-    for _, row in df.iterrows():
-        if processed >= args.n:
-            break
+    df = pd.read_csv(args.csv_path, usecols=[cov_col_real, url_col_real], nrows=args.n,
+                     dtype=str, keep_default_na=False)
 
-        raw_cov = str(row.get(cov_col_real, "")).strip()
-        cov_num = raw_cov.replace("#", "") if raw_cov else "(unknown-id)"
-        url = str(row.get(url_col_real, "")).strip()
-
-        if not url:
-            rows.append({
-                "Covidence #": cov_num,
-                "decision": "UnknownAge",
-                "reasons": "No URL provided",
-                "source_url": "",
-                "evidence": "",
-            })
-            processed += 1
-            continue
+    # rows are written as they complete (not in input order) rather than collected
+    out_f = open(args.out, "w", newline="", encoding="utf-8", buffering=1 << 20) if args.out else None
+    writer = csv.DictWriter(out_f, fieldnames=OUT_FIELDS) if out_f else None
+    if writer:
+        writer.writeheader()
+
+    def emit(row: Dict) -> None:
+        if writer:
+            writer.writerow(row)
 
-        text, src = fetch_fulltext_from_url(url)
-        evid = extract_age_evidence(text) if text else []
-        dec = decide_age(evid, cov_num, src)
-
-        rows.append({
-            "Covidence #": dec.covidence_num,
-            "decision": dec.decision,
-            "reasons": "; ".join(dec.reasons),
-            "source_url": dec.source_url,
-            "evidence": dec.evidence,
-        })
-        processed += 1
-        time.sleep(0.3)
-
-    if args.out:
-        pd.DataFrame(rows).to_csv(args.out, index=False)
+    try:
+        jobs = []  # (cov_num, url)
+        for url, raw_cov in df[[url_col_real, cov_col_real]].itertuples(index=False, name=None):
+            raw_cov = raw_cov.strip()
+            cov_num = raw_cov.replace("#", "") if raw_cov else "(unknown-id)"
+            url = url.strip()
+
+            if not url:
+                emit({
+                    "Covidence #": cov_num,
+                    "decision": "UnknownAge",
+                    "reasons": "No URL provided",
+                    "source_url": "",
+                    "evidence": "",
+                })
+                continue
+
+            jobs.append((cov_num, url))
+
+        # stage 1 (threads) only does network I/O; stage 2 (processes) parses, extracts
+        # and decides as fetches complete, so PDF parsing is spread over all cores.
+        # The Pool is created first so its workers fork before any fetch threads exist.
+        use_cache = not args.no_cache
+        with multiprocessing.Pool(processes=args.procs) as pool, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
+            # at most 2x workers fetches in flight, and each finished one is dropped from
+            # `pending` as it goes to the pool, so only a bounded set of bodies is held
+            todo = iter(_interleave_by_host(jobs))
+            pending: Dict[concurrent.futures.Future, Tuple[str, str]] = {}
+
+            def submit_more():
+                for cov_num, url in itertools.islice(todo, 2 * args.workers - len(pending)):
+                    pending[executor.submit(fetch_document, url, use_cache)] = (cov_num, url)
+
+            def fetched():
+                submit_more()
+                while pending:
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for fut in done:
+                        cov_num, url = pending.pop(fut)
+                        try:
+                            doc = fut.result()
+                        except Exception:
+                            # this generator feeds imap_unordered; raising here would end the whole run
+                            doc = FetchedDoc(url)
+                        yield cov_num, doc, use_cache
+                    submit_more()
+
+            # chunksize 1: each task may carry a multi-MB body and a slow PDF parse
+            for row in pool.imap_unordered(_process_doc, fetched()):
+                emit(row)
+    finally:
+        if out_f:
+            out_f.close()
 
 if __name__ == "__main__":
     main()
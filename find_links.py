@@ -1,14 +1,37 @@
 from __future__ import annotations
 import argparse
+import asyncio
+import json
+import os
 import re
 import time
-from typing import Optional, Tuple, Dict
+from collections import defaultdict
+from typing import List, Optional, Tuple, Dict
+from urllib.parse import urlparse
+import diskcache
+import httpx
 import pandas as pd
-import requests
 
 UA = "emily-research-screen/1.0 (mailto:xmeng05@uw.edu)"
 CROSSREF = "https://api.crossref.org/works"
 SERPAPI = "https://serpapi.com/search.json"
+HOST_DELAY = 0.3  # seconds between requests to the same host
+MAX_CONCURRENT = 5  # in-flight Crossref/SerpAPI requests (polite bound)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+CACHE_TTL = 30 * 86400  # seconds; Crossref/Scholar answers for a title rarely change
+
+_DOI_RE = re.compile(r"(10\.\d{4,9}/[^\s\"<>]+)", re.I)
+_DOI_URL_PREFIX_RE = re.compile(r"^(https?://(dx\.)?doi\.org/)", re.I)
+_DOI_SCHEME_RE = re.compile(r"^(doi:)\s*", re.I)
+_WS_RE = re.compile(r"\s+")
+
+# persistent lookup cache (SQLite-backed) shared by Crossref and SerpAPI queries
+_CR_CACHE = diskcache.Cache(os.path.expanduser(os.environ.get("GRAND_CROSSREF_CACHE", "~/.cache/grand-crossref")))
+_MISS = object()
+
+# per-host politeness: one lock + last-request timestamp per netloc
+_HOST_LOCKS: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+_HOST_LAST: Dict[str, float] = defaultdict(float)
 
 def is_missing(x) -> bool:
     if x is None:
@@ -22,9 +45,9 @@ def normalize_doi(s: Optional[str]) -> Optional[str]:
     if is_missing(s):
         return None
     s = str(s).strip()
-    s = re.sub(r"^(https?://(dx\.)?doi\.org/)", "", s, flags=re.I)
-    s = re.sub(r"^(doi:)\s*", "", s, flags=re.I)
-    m = re.search(r"(10\.\d{4,9}/[^\s\"<>]+)", s, flags=re.I)
+    s = _DOI_URL_PREFIX_RE.sub("", s)
+    s = _DOI_SCHEME_RE.sub("", s)
+    m = _DOI_RE.search(s)
     return m.group(1) if m else None
 
 def doi_to_url(doi: Optional[str]) -> Optional[str]:
@@ -41,7 +64,7 @@ def first_author_from(authors: str) -> Optional[str]:
     return s or None
 
 def normalize_title(title: str) -> str:
-    return re.sub(r"\s+", " ", (title or "").strip())
+    return _WS_RE.sub(" ", (title or "").strip())
 
 def short_title(title: str) -> str:
     t = normalize_title(title)
@@ -49,28 +72,56 @@ def short_title(title: str) -> str:
     t = t.split(":")[0]
     return t.strip()
 
-def polite_get(url: str, params: dict, timeout=25) -> Optional[requests.Response]:
+async def _wait_for_host(host: str, gap: float = HOST_DELAY) -> None:
+    async with _HOST_LOCKS[host]:
+        dt = time.monotonic() - _HOST_LAST[host]
+        if dt < gap:
+            await asyncio.sleep(gap - dt)
+        _HOST_LAST[host] = time.monotonic()
+
+async def polite_get(
+    client: httpx.AsyncClient, url: str, params: dict, timeout=25, retries: int = 2,
+    gap: float = HOST_DELAY,
+) -> Optional[httpx.Response]:
     try:
-        r = requests.get(url, params=params, headers={"User-Agent": UA}, timeout=timeout)
-        if r.status_code == 200:
-            return r
+        for attempt in range(retries + 1):
+            await _wait_for_host(urlparse(url).netloc, gap)
+            r = await client.get(url, params=params, timeout=timeout)
+            if r.status_code == 200:
+                return r
+            if r.status_code not in RETRY_STATUS or attempt == retries:
+                return None
+            await asyncio.sleep(0.3 * 2 ** attempt)
     except Exception:
         return None
     return None
 
-def crossref_top_item(params: Dict, sleep_sec: float = 0.3):
-    r = polite_get(CROSSREF, {**params, "rows": 1})
+async def crossref_top_item(
+    client: httpx.AsyncClient, sem: asyncio.Semaphore, params: Dict,
+    sleep_sec: float = 0.3, use_cache: bool = True,
+):
+    params = {**params, "rows": 1}
+    key = "crossref:" + json.dumps(sorted(params.items()))
+    if use_cache:
+        hit = _CR_CACHE.get(key, _MISS)
+        if hit is not _MISS:
+            return hit
+    async with sem:
+        r = await polite_get(client, CROSSREF, params, gap=sleep_sec)
     if not r:
-        time.sleep(sleep_sec); return None
+        return None
     try:
         items = r.json().get("message", {}).get("items", [])
-        time.sleep(sleep_sec)
-        return items[0] if items else None
+        item = items[0] if items else None
+        if use_cache:
+            _CR_CACHE.set(key, item, expire=CACHE_TTL)
+        return item
     except Exception:
-        time.sleep(sleep_sec); return None
+        return None
 
-def robust_crossref_find_doi(
-    title: str, first_author: Optional[str], sleep_sec: float = 0.3
+async def robust_crossref_find_doi(
+    client: httpx.AsyncClient, sem: asyncio.Semaphore, title: str, first_author: Optional[str],
+    sleep_sec: float = 0.3, use_cache: bool = True,
 ) -> Tuple[str, str]:
     title = normalize_title(title)
     short = short_title(title)
@@ -78,7 +129,7 @@ def robust_crossref_find_doi(
     params = {"query.title": title}
     if first_author:
         params["query.author"] = first_author
-    it = crossref_top_item(params, sleep_sec)
+    it = await crossref_top_item(client, sem, params, sleep_sec, use_cache)
     if it and it.get("DOI"):
         doi = normalize_doi(it.get("DOI"))
         url = it.get("URL") or doi_to_url(doi)
@@ -88,7 +139,7 @@ def robust_crossref_find_doi(
         params = {"query.title": short}
         if first_author:
             params["query.author"] = first_author
-        it = crossref_top_item(params, sleep_sec)
+        it = await crossref_top_item(client, sem, params, sleep_sec, use_cache)
         if it and it.get("DOI"):
             doi = normalize_doi(it.get("DOI"))
             url = it.get("URL") or doi_to_url(doi)
@@ -96,53 +147,91 @@ def robust_crossref_find_doi(
 
     return ("NOT_FOUND", "")
 
-def serpapi_scholar_link(title: str, author: Optional[str], api_key: str) -> Tuple[str, str]:
+async def serpapi_scholar_link(
+    client: httpx.AsyncClient, sem: asyncio.Semaphore, title: str, author: Optional[str],
+    api_key: str, use_cache: bool = True,
+) -> Tuple[str, str]:
+    key = "serpapi:" + json.dumps([title, author])
+    if use_cache:
+        hit = _CR_CACHE.get(key, _MISS)
+        if hit is not _MISS:
+            return tuple(hit)
     try:
         q = f"{title} {author}" if author else title
-        r = requests.get(
-            SERPAPI,
-            params={"engine": "google_scholar", "q": q, "hl": "en", "api_key": api_key},
-            timeout=25,
-        )
-        if r.status_code != 200:
+        async with sem:
+            r = await polite_get(
+                client, SERPAPI,
+                {"engine": "google_scholar", "q": q, "hl": "en", "api_key": api_key},
+            )
+        if not r:
             return ("NOT_FOUND", "")
         data = r.json()
         results = data.get("organic_results") or []
+        found = ("NOT_FOUND", "")
         for res in results:
             link = res.get("link") or ""
             if not link:
                 continue
-            m = re.search(r"(10\.\d{4,9}/[^\s\"<>]+)", link, flags=re.I)
+            m = _DOI_RE.search(link)
             if m:
                 doi = normalize_doi(m.group(1))
-                return (doi or "NOT_FOUND", link)
-        if results:
-            return ("NOT_FOUND", results[0].get("link") or "")
-        return ("NOT_FOUND", "")
+                found = (doi or "NOT_FOUND", link)
+                break
+        else:
+            if results:
+                found = ("NOT_FOUND", results[0].get("link") or "")
+        if use_cache:
+            _CR_CACHE.set(key, found, expire=CACHE_TTL)
+        return found
     except Exception:
         return ("NOT_FOUND", "")
 
+async def _resolve_row(
+    client: httpx.AsyncClient, sem: asyncio.Semaphore, row: Dict,
+    serpapi_key: Optional[str], use_cache: bool,
+) -> None:
+    first_author = first_author_from(row["authors"])
+    found_doi, found_url = await robust_crossref_find_doi(client, sem, row["title"], first_author, use_cache=use_cache)
+    source = "crossref"
+    if found_doi == "NOT_FOUND" and serpapi_key:
+        s_doi, s_url = await serpapi_scholar_link(client, sem, row["title"], first_author, serpapi_key, use_cache)
+        if s_doi != "NOT_FOUND":
+            found_doi, found_url, source = s_doi, (s_url or doi_to_url(s_doi)), "scholar"
+    row.update({"found_doi": found_doi or "NOT_FOUND", "found_url": found_url or "", "source": source})
+
+async def resolve_missing(rows: List[Dict], serpapi_key: Optional[str], use_cache: bool = True) -> None:
+    """Fill found_doi/found_url/source in place for rows without a CSV DOI, concurrently."""
+    # asyncio locks must not outlive the event loop that waited on them
+    _HOST_LOCKS.clear()
+    transport = httpx.AsyncHTTPTransport(http2=True, retries=2, limits=httpx.Limits(max_connections=32))
+    async with httpx.AsyncClient(headers={"User-Agent": UA}, transport=transport) as client:
+        sem = asyncio.Semaphore(MAX_CONCURRENT)
+        await asyncio.gather(*(_resolve_row(client, sem, row, serpapi_key, use_cache) for row in rows))
+
 def main():
     ap = argparse.ArgumentParser(description="Resolve missing DOIs from a Covidence CSV via Crossref (and optional Scholar fallback).")
     ap.add_argument("csv_path", help="Path to covidence.csv")
     ap.add_argument("--n", type=int, default=20, help="How many rows to try")
     ap.add_argument("--serpapi-key", default=None, help="SerpAPI key to enable Google Scholar fallback")
     ap.add_argument("--out", default=None, help="Optional path to write a results CSV")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and don't write the lookup cache ($GRAND_CROSSREF_CACHE)")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.csv_path)
+    # header only, to resolve column names before the real (narrow) read
+    columns = list(pd.read_csv(args.csv_path, nrows=0).columns)
     # build case-insensitive mapping -> original column names
-    colmap = {c.lower().strip(): c for c in df.columns}
+    colmap = {c.lower().strip(): c for c in columns}
+    wanted = [colmap[k] for k in ("covidence #", "title", "authors", "doi", "url") if k in colmap]
+
+    df = pd.read_csv(args.csv_path, usecols=wanted, nrows=args.n, dtype=str, keep_default_na=False)
+    pos = {c: i for i, c in enumerate(df.columns)}
 
     def get(row, name, default=""):
         col = colmap.get(name.lower())
-        return row.get(col, default) if col else default
+        return row[pos[col]] if col else default
 
     rows = []
-    tried = 0
-    for _, row in df.iterrows():
-        if tried >= args.n: break
-
+    for row in df.itertuples(index=False, name=None):
         # Covidence #: keep header as-is in output, strip leading '#'
         cov_raw = str(get(row, "Covidence #", "")).strip()
         cov_id  = cov_raw.replace("#", "") if cov_raw else ""
@@ -151,31 +240,21 @@ def main():
         authors = str(get(row, "authors", "")).strip()
         doi_csv = normalize_doi(get(row, "doi", ""))
 
-        first_author = first_author_from(authors)
-
-        source = "csv"
-        found_doi = doi_csv or ""
         found_url = str(get(row, "url", "")).strip() or (doi_to_url(doi_csv) if doi_csv else "")
 
-        if not doi_csv:
-            found_doi, found_url = robust_crossref_find_doi(title, first_author)
-            source = "crossref"
-            if found_doi == "NOT_FOUND" and args.serpapi_key:
-                s_doi, s_url = serpapi_scholar_link(title, first_author, args.serpapi_key)
-                if s_doi != "NOT_FOUND":
-                    found_doi, found_url, source = s_doi, (s_url or doi_to_url(s_doi)), "scholar"
-
         rows.append({
             "Covidence #": cov_id,
             "title": title,
             "authors": authors,
             "csv_doi": doi_csv or "",
-            "found_doi": found_doi or "NOT_FOUND",
+            "found_doi": doi_csv or "NOT_FOUND",
             "found_url": found_url or "",
-            "source": source,
+            "source": "csv",
         })
-        time.sleep(0.2)
-        tried += 1
+
+    missing = [r for r in rows if not r["csv_doi"]]
+    if missing:
+        asyncio.run(resolve_missing(missing, args.serpapi_key, use_cache=not args.no_cache))
 
     if args.out:
         pd.DataFrame(rows).to_csv(args.out, index=False)